@@ -5,23 +5,97 @@ This module provides a Starlark-based policy engine for defining and evaluating
 GPU allocation, scheduling, and optimization policies.
 """
 
+import ast
+import copy
+import functools
+import hashlib
+import heapq
+import logging
 import os
+import re
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+import types
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 
+import numpy as np
+
 try:
     from starlark import Starlark
 except ImportError:
     # Fallback to go.starlark.net via Python bindings
     Starlark = None
 
+try:
+    import numba
+except ImportError:
+    # Optional accelerator; scoring falls back to pure Python / NumPy.
+    numba = None
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional accelerator; type matching falls back to a compiled regex.
+    ahocorasick = None
+
+# Registration and load paths log through here rather than print();
+# disabled levels are a cheap no-op instead of a write(2) per pool.
+_log = logging.getLogger(__name__)
+
 # ============================================================================
 # Policy Data Models
 # ============================================================================
 
-@dataclass
+# Tag names mapped to bit positions, assigned lazily in first-seen order.
+# With a small tag vocabulary the subset test in _meets_requirements becomes
+# a single AND+compare on integer masks instead of two set constructions.
+_TAG_VOCAB: Dict[str, int] = {}
+
+
+def _requirements_key(requirements: Dict[str, Any]) -> Tuple:
+    """Normalize a requirements dict into a hashable, order-insensitive key."""
+    return tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in requirements.items()
+    ))
+
+
+class _NormReq(NamedTuple):
+    """Allocation requirements flattened into a cheap per-batch struct."""
+    min_memory: Optional[float]
+    max_temp: Optional[float]
+    tag_mask: int
+
+
+@functools.lru_cache(maxsize=256)
+def _normalized_requirements(key: Tuple) -> _NormReq:
+    """Build a _NormReq from a _requirements_key tuple, once per distinct key."""
+    requirements = dict(key)
+    tags = requirements.get('tags')
+    return _NormReq(
+        min_memory=requirements.get('min_memory'),
+        max_temp=requirements.get('max_temp'),
+        tag_mask=_tag_mask(tags) if tags else 0,
+    )
+
+
+def _tag_mask(tags: Iterable[str]) -> int:
+    """Pack a tag list into a bitmask, growing the vocabulary as needed."""
+    mask = 0
+    for tag in tags:
+        bit = _TAG_VOCAB.get(tag)
+        if bit is None:
+            bit = len(_TAG_VOCAB)
+            _TAG_VOCAB[tag] = bit
+        mask |= 1 << bit
+    return mask
+
+
+@dataclass(slots=True)
 class GPUInfo:
     """Represents a single GPU device."""
     id: int
@@ -34,9 +108,46 @@ class GPUInfo:
     registered: bool = False
     pool: str = ""
     tags: List[str] = field(default_factory=list)
-
-
-@dataclass
+    # Derived from tags at construction; stale if tags are mutated afterwards.
+    tag_mask: int = 0
+
+    def __post_init__(self):
+        # Interned names make membership tests against pool type sets a
+        # pointer-equality bucket probe instead of a character compare.
+        self.name = sys.intern(self.name)
+        if self.pool:
+            self.pool = sys.intern(self.pool)
+        self.tag_mask = _tag_mask(self.tags)
+
+
+class GPUInfoTable:
+    """
+    Struct-of-arrays view over a GPU fleet.
+
+    Numeric and boolean attributes live in contiguous NumPy arrays so policy
+    checks over thousands of GPUs run as vectorized comparisons instead of
+    per-GPU Python attribute loads.
+    """
+
+    def __init__(self, gpus: List[GPUInfo]):
+        self.gpus: List[GPUInfo] = list(gpus)
+        self.memory_gb = np.array([g.memory_gb for g in self.gpus], dtype=np.float32)
+        self.temperature_c = np.array([g.temperature_c for g in self.gpus], dtype=np.float32)
+        self.power_w = np.array([g.power_w for g in self.gpus], dtype=np.float32)
+        self.online = np.array([g.online for g in self.gpus], dtype=np.bool_)
+        self.names = np.array([g.name for g in self.gpus], dtype=object)
+        self.pools = np.array([g.pool for g in self.gpus], dtype=object)
+        self.tags = np.array([g.tags for g in self.gpus], dtype=object)
+        # uint64 while the tag vocabulary fits in 64 bits; object (Python int)
+        # masks keep the same AND+compare working beyond that.
+        mask_dtype = np.uint64 if len(_TAG_VOCAB) <= 64 else object
+        self.tag_masks = np.array([g.tag_mask for g in self.gpus], dtype=mask_dtype)
+
+    def __len__(self) -> int:
+        return len(self.gpus)
+
+
+@dataclass(slots=True)
 class GPUPool:
     """Defines a GPU pool configuration."""
     name: str
@@ -47,26 +158,60 @@ class GPUPool:
     health_threshold: float = 0.9
     opt_strategies: List[Dict[str, Any]] = field(default_factory=list)
     health_checks: List[Dict[str, Any]] = field(default_factory=list)
-
-
-@dataclass
+    # Matching structures derived from gpu_types, built once per pool.
+    _gpu_types_set: frozenset = field(init=False, repr=False, compare=False,
+                                      default=frozenset())
+    _gpu_types_re: Optional[re.Pattern] = field(init=False, repr=False, compare=False,
+                                                default=None)
+    _name_matcher: Optional[Any] = field(init=False, repr=False, compare=False,
+                                         default=None)
+
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.gpu_types = [sys.intern(t) for t in self.gpu_types]
+        self._gpu_types_set = frozenset(self.gpu_types)
+        if self.gpu_types:
+            # Alternation compiles to a single scan over the GPU name instead
+            # of one substring search per type.
+            self._gpu_types_re = re.compile(
+                "|".join(re.escape(t) for t in self.gpu_types)
+            )
+            if ahocorasick is not None:
+                # Aho-Corasick automaton: one DFA pass per name, cost
+                # independent of how many types the pool lists.
+                matcher = ahocorasick.Automaton()
+                for gpu_type in self.gpu_types:
+                    matcher.add_word(gpu_type, gpu_type)
+                matcher.make_automaton()
+                self._name_matcher = matcher
+
+    def _name_contains_type(self, name: str) -> bool:
+        """True if any configured gpu_type occurs as a substring of name."""
+        if self._name_matcher is not None:
+            return next(self._name_matcher.iter(name), None) is not None
+        return self._gpu_types_re.search(name) is not None
+
+
+@dataclass(slots=True)
 class ScheduleRule:
     """Defines a scheduling rule."""
     type: str
+    label: Optional[str] = None
     metric: Optional[str] = None
     strategy: Optional[str] = None
     values: Optional[List[str]] = None
     allow: Optional[bool] = None
+    priority_threshold: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleRuleset:
     """Defines a set of scheduling rules."""
     name: str
     rules: List[ScheduleRule] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Policy:
     """Represents a complete policy document."""
     name: str
@@ -75,6 +220,162 @@ class Policy:
     schedules: List[ScheduleRuleset] = field(default_factory=list)
 
 
+# ============================================================================
+# GPU Scoring Kernels
+# ============================================================================
+
+def _score_kernel(online: bool, memory_gb: float, temperature_c: float) -> float:
+    """Suitability score for a single GPU; kept branch-simple so Numba can JIT it."""
+    score = 1.0
+
+    # Prefer GPUs with better health
+    if online:
+        score += 0.5
+
+    # Prefer GPUs with more memory
+    if memory_gb >= 16:
+        score += 0.3
+
+    # Prefer cooler GPUs
+    if temperature_c < 60:
+        score += 0.2
+
+    # Penalize high temperature
+    elif temperature_c > 80:
+        score -= 0.3
+
+    return score
+
+
+if numba is not None:
+    _score_kernel = numba.njit(cache=True)(_score_kernel)
+
+    @numba.njit(parallel=True, cache=True)
+    def _score_batch(online: np.ndarray, memory_gb: np.ndarray,
+                     temperature_c: np.ndarray) -> np.ndarray:
+        out = np.empty(online.shape[0], dtype=np.float32)
+        for i in numba.prange(online.shape[0]):
+            out[i] = _score_kernel(online[i], memory_gb[i], temperature_c[i])
+        return out
+
+    @numba.njit(parallel=True, cache=True)
+    def _match_batch(memory_gb: np.ndarray, temperature_c: np.ndarray,
+                     online: np.ndarray, tag_masks: np.ndarray,
+                     min_memory: float, max_temp: float,
+                     req_tag_mask: np.uint64) -> Tuple[np.ndarray, np.ndarray]:
+        """Fused requirement check + score over contiguous fleet arrays."""
+        n = memory_gb.shape[0]
+        match = np.empty(n, dtype=np.bool_)
+        scores = np.empty(n, dtype=np.float32)
+        for i in numba.prange(n):
+            match[i] = (
+                memory_gb[i] >= min_memory
+                and temperature_c[i] <= max_temp
+                and (tag_masks[i] & req_tag_mask) == req_tag_mask
+            )
+            scores[i] = _score_kernel(online[i], memory_gb[i], temperature_c[i])
+        return match, scores
+else:
+    _score_batch = None
+    _match_batch = None
+
+
+# ============================================================================
+# Policy Parse Cache
+# ============================================================================
+
+# Parsed policies keyed by absolute path, storing (mtime_ns, parsed_policy).
+# Long-running services reload the same .gsky files repeatedly; skipping the
+# re-read + re-parse when the file is unchanged avoids that per-call cost.
+_AST_CACHE: Dict[str, Tuple[int, Policy]] = {}
+
+
+def clear_policy_cache() -> None:
+    """Clear the parsed-policy cache (mainly for tests)."""
+    _AST_CACHE.clear()
+
+
+def policy_cache_size() -> int:
+    """Return the number of cached parsed policies."""
+    return len(_AST_CACHE)
+
+
+# Compiled policy bytecode keyed by source hash, so identical sources (e.g.
+# the same file under two paths, or a re-read after a no-op touch) compile
+# exactly once per process.
+_BYTECODE_CACHE: Dict[str, types.CodeType] = {}
+
+
+def compile_policy(code: str, filename: str = "<policy>") -> types.CodeType:
+    """Compile policy source to bytecode, cached by source hash."""
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    bytecode = _BYTECODE_CACHE.get(key)
+    if bytecode is None:
+        bytecode = compile(code, filename, "exec")
+        _BYTECODE_CACHE[key] = bytecode
+    return bytecode
+
+
+def _is_trivial_policy(code: str) -> bool:
+    """
+    True for policies that only register a single pool with literal
+    arguments — the shape where full compilation costs more than it buys.
+    """
+    return (
+        "schedule_ruleset" not in code
+        and "def " not in code
+        and "import" not in code
+        and code.count("gpu_pool(") == 1
+        and code.count("register_pool") == 1
+    )
+
+
+def _parse_trivial_policy(code: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract gpu_pool kwargs from a trivial policy via string probes,
+    skipping the bytecode pipeline. Returns None (caller falls back to
+    full execution) on anything unexpected, e.g. non-literal arguments.
+    """
+    start = code.find("gpu_pool(")
+    open_idx = start + len("gpu_pool")
+
+    # Find the matching close paren, skipping over string literals.
+    depth = 0
+    quote = ""
+    end = -1
+    for i in range(open_idx, len(code)):
+        ch = code[i]
+        if quote:
+            if ch == "\\":
+                continue
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                end = i
+                break
+    if end < 0:
+        return None
+
+    try:
+        call = ast.parse("_(" + code[open_idx + 1:end] + ")", mode="eval").body
+        if call.args:
+            return None
+        kwargs = {}
+        for keyword in call.keywords:
+            if keyword.arg is None:
+                return None
+            kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+        return kwargs
+    except (SyntaxError, ValueError):
+        return None
+
+
 # ============================================================================
 # Starlark Built-in Functions
 # ============================================================================
@@ -85,16 +386,24 @@ class GPUOpsModule:
     def __init__(self):
         self.pools: Dict[str, GPUPool] = {}
         self.schedules: Dict[str, ScheduleRuleset] = {}
+        # Bumped on every pool registration; lets callers invalidate anything
+        # derived from the pool set without watching the dict itself.
+        self._version = 0
+        # Memoized get_all_pools() result; rebuilt lazily after registration.
+        self._pools_list_cache: Optional[List[GPUPool]] = None
 
     def register_pool(self, pool: GPUPool) -> None:
         """Register a GPU pool."""
         self.pools[pool.name] = pool
-        print(f"[Policy] Registered pool: {pool.name}")
+        self._version += 1
+        self._pools_list_cache = None
+        _log.debug("Registered pool: %s", pool.name)
 
     def register_schedule(self, schedule: ScheduleRuleset) -> None:
         """Register a schedule ruleset."""
         self.schedules[schedule.name] = schedule
-        print(f"[Policy] Registered schedule: {schedule.name}")
+        self._version += 1
+        _log.debug("Registered schedule: %s", schedule.name)
 
     def get_pool(self, name: str) -> Optional[GPUPool]:
         """Get a pool by name."""
@@ -102,13 +411,44 @@ class GPUOpsModule:
 
     def get_all_pools(self) -> List[GPUPool]:
         """Get all pools."""
-        return list(self.pools.values())
+        # Every evaluate_allocation call iterates this; reuse one list
+        # instead of materializing the dict values each time.
+        if self._pools_list_cache is None:
+            self._pools_list_cache = list(self.pools.values())
+        return self._pools_list_cache
 
     def get_schedule(self, name: str) -> Optional[ScheduleRuleset]:
         """Get a schedule by name."""
         return self.schedules.get(name)
 
 
+class _RecordingGPUOps:
+    """
+    Stand-in for gpu_ops during policy execution.
+
+    Forwards registrations to the real GPUOpsModule while recording exactly
+    what this execution registered, so the resulting Policy reflects the
+    file's own registrations regardless of name collisions or load order.
+    """
+
+    def __init__(self, gpu_ops: GPUOpsModule):
+        self._gpu_ops = gpu_ops
+        self.pools: List[GPUPool] = []
+        self.schedules: List[ScheduleRuleset] = []
+
+    def register_pool(self, pool: GPUPool) -> None:
+        self.pools.append(pool)
+        self._gpu_ops.register_pool(pool)
+
+    def register_schedule(self, schedule: ScheduleRuleset) -> None:
+        self.schedules.append(schedule)
+        self._gpu_ops.register_schedule(schedule)
+
+    def __getattr__(self, name: str) -> Any:
+        # Reads (get_pool, get_all_pools, ...) pass through untouched.
+        return getattr(self._gpu_ops, name)
+
+
 # ============================================================================
 # Policy Engine
 # ============================================================================
@@ -120,26 +460,36 @@ class PolicyEngine:
         self.policy_dir = Path(policy_dir) if policy_dir else Path("./policies")
         self.policies: Dict[str, Policy] = {}
         self.gpu_ops = GPUOpsModule()
+        self._pool_bounds: Optional[Tuple[int, List[GPUPool], np.ndarray, np.ndarray, np.ndarray]] = None
+        self._verdict_cache: OrderedDict[Tuple, bool] = OrderedDict()
+        # Serializes policy execution and registry writes during loads.
+        self._load_lock = threading.Lock()
         self._setup_starlark_globals()
 
     def _setup_starlark_globals(self):
-        """Set up global symbols available to Starlark scripts."""
+        """
+        Set up global symbols available to Starlark scripts.
+
+        Rule and strategy constructors are pre-bound partials built once
+        here, so each call in a policy file goes straight to the target
+        constructor without an intermediate **kwargs dict round-trip.
+        """
         self.globals = {
             # GPU pool functions
             "gpu_pool": self._create_gpu_pool,
-            "optimize_clock": self._create_optimize_clock,
-            "optimize_memory": self._create_optimize_memory,
-            "optimize_power": self._create_optimize_power,
+            "optimize_clock": functools.partial(dict, type="clock"),
+            "optimize_memory": functools.partial(dict, type="memory"),
+            "optimize_power": functools.partial(dict, type="power"),
             "check": self._create_health_check,
 
             # Scheduling functions
-            "priority_rule": self._create_priority_rule,
-            "balance_rule": self._create_balance_rule,
-            "distribution_rule": self._create_distribution_rule,
-            "preemption_rule": self._create_preemption_rule,
+            "priority_rule": functools.partial(ScheduleRule, type="priority"),
+            "balance_rule": functools.partial(ScheduleRule, type="balance"),
+            "distribution_rule": functools.partial(ScheduleRule, type="distribution"),
+            "preemption_rule": functools.partial(ScheduleRule, type="preemption"),
 
             # Registration
-            "schedule_ruleset": self._create_schedule_ruleset,
+            "schedule_ruleset": ScheduleRuleset,
             "gpu_ops": self.gpu_ops,
         }
 
@@ -165,33 +515,9 @@ class PolicyEngine:
             health_checks=kwargs.get('health_checks', []),
         )
 
-    def _create_optimize_clock(self, **kwargs) -> Dict[str, Any]:
-        return {"type": "clock", **kwargs}
-
-    def _create_optimize_memory(self, **kwargs) -> Dict[str, Any]:
-        return {"type": "memory", **kwargs}
-
-    def _create_optimize_power(self, **kwargs) -> Dict[str, Any]:
-        return {"type": "power", **kwargs}
-
     def _create_health_check(self, name: str, **kwargs) -> Dict[str, Any]:
         return {"name": name, **kwargs}
 
-    def _create_priority_rule(self, **kwargs) -> ScheduleRule:
-        return ScheduleRule(type="priority", **kwargs)
-
-    def _create_balance_rule(self, **kwargs) -> ScheduleRule:
-        return ScheduleRule(type="balance", **kwargs)
-
-    def _create_distribution_rule(self, **kwargs) -> ScheduleRule:
-        return ScheduleRule(type="distribution", **kwargs)
-
-    def _create_preemption_rule(self, **kwargs) -> ScheduleRule:
-        return ScheduleRule(type="preemption", **kwargs)
-
-    def _create_schedule_ruleset(self, **kwargs) -> ScheduleRuleset:
-        return ScheduleRuleset(**kwargs)
-
     # ---------------------------------------------------------------------
     # Policy Loading
     # ---------------------------------------------------------------------
@@ -203,141 +529,312 @@ class PolicyEngine:
             # Try relative to policy_dir
             path = self.policy_dir / policy_path
             if not path.exists():
-                print(f"[Policy] Policy not found: {policy_path}")
+                _log.warning("Policy not found: %s", policy_path)
                 return False
 
-        print(f"[Policy] Loading policy from: {path}")
+        _log.debug("Loading policy from: %s", path)
 
         try:
-            # Read policy file
+            cache_key = str(path.resolve())
+            mtime_ns = path.stat().st_mtime_ns
+
+            cached = _AST_CACHE.get(cache_key)
+            if cached is not None and cached[0] == mtime_ns:
+                # Unchanged on disk; reuse the parsed policy without re-reading,
+                # replaying its registrations into this engine.
+                policy = copy.deepcopy(cached[1])
+                with self._load_lock:
+                    for pool in policy.pools:
+                        self.gpu_ops.register_pool(pool)
+                    for schedule in policy.schedules:
+                        self.gpu_ops.register_schedule(schedule)
+                    self.policies[path.stem] = policy
+                return True
+
+            # Read policy file (outside the lock so concurrent loads overlap
+            # their I/O and compilation)
             with open(path, 'r') as f:
                 code = f.read()
 
-            # For now, just parse and show what would be loaded
-            # In production, use actual Starlark interpreter
-            self._parse_policy_simple(code, path.stem)
-
+            # Single-pool policies with literal arguments skip compilation
+            # entirely; anything surprising falls through to full execution.
+            if _is_trivial_policy(code):
+                kwargs = _parse_trivial_policy(code)
+                if kwargs is not None:
+                    with self._load_lock:
+                        pool = self._create_gpu_pool(**kwargs)
+                        self.gpu_ops.register_pool(pool)
+                        policy = Policy(name=path.stem, pools=[pool])
+                        self.policies[path.stem] = policy
+                        _AST_CACHE[cache_key] = (mtime_ns, copy.deepcopy(policy))
+                    return True
+
+            bytecode = compile_policy(code, str(path))
+
+            # Execution registers into shared engine state, and _execute_policy
+            # diffs the registries before/after; both need to be atomic.
+            with self._load_lock:
+                policy = self._execute_policy(bytecode, path.stem)
+                self.policies[path.stem] = policy
+                _AST_CACHE[cache_key] = (mtime_ns, copy.deepcopy(policy))
             return True
 
         except Exception as e:
-            print(f"[Policy] Error loading policy: {e}")
+            _log.error("Error loading policy %s: %s", path, e)
             return False
 
     def load_all_policies(self) -> int:
         """Load all policies from the policy directory."""
         count = 0
         if not self.policy_dir.exists():
-            print(f"[Policy] Policy directory not found: {self.policy_dir}")
+            _log.warning("Policy directory not found: %s", self.policy_dir)
             return count
 
-        for policy_file in self.policy_dir.glob("*.gsky"):
-            if self.load_policy(policy_file):
-                count += 1
-
-        print(f"[Policy] Loaded {count} policy file(s)")
+        # os.scandir avoids the per-entry Path construction and fnmatch
+        # machinery of Path.glob; a suffix check is all the filter we need.
+        with os.scandir(self.policy_dir) as entries:
+            paths = [
+                entry.path for entry in entries
+                if entry.name.endswith(".gsky") and entry.is_file(follow_symlinks=False)
+            ]
+
+        if paths:
+            # File reads and compilation overlap across threads; execution
+            # itself serializes on _load_lock inside load_policy.
+            workers = min(8, os.cpu_count() or 1, len(paths))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                count = sum(executor.map(self.load_policy, paths))
+
+        _log.info("Loaded %d policy file(s)", count)
         return count
 
-    def _parse_policy_simple(self, code: str, name: str):
+    def _execute_policy(self, bytecode: types.CodeType, name: str) -> Policy:
         """
-        Simple policy parser (placeholder for actual Starlark interpreter).
-        In production, this would use the go.starlark.net or pure Python Starlark.
+        Execute compiled policy bytecode against the engine globals.
+
+        Policy files use Starlark's Python-compatible syntax, so they run on
+        CPython's own bytecode interpreter; pools and schedules registered
+        during execution are captured onto the returned Policy.
         """
-        # Extract basic information from the policy
-        print(f"[Policy] Parsing: {name}")
-        print(f"[Policy] This is a placeholder for actual Starlark execution")
+        # Record registrations as they happen rather than diffing registry
+        # keys afterwards: a policy that re-registers an existing name, or
+        # two files racing under the load thread pool, would otherwise be
+        # attributed the wrong (or no) pools.
+        recorder = _RecordingGPUOps(self.gpu_ops)
 
-        # For now, create a mock policy with basic info
-        self.policies[name] = Policy(name=name)
+        # Fresh namespace per policy; registrations still reach the shared
+        # module through the recorder.
+        namespace = dict(self.globals)
+        namespace["gpu_ops"] = recorder
+        exec(bytecode, namespace)
 
-        # Extract pool definitions (simple regex-based for demo)
-        import re
-        pool_names = re.findall(r'name\s*=\s*["\'](\w+)["\']', code)
-        for pool_name in pool_names:
-            print(f"[Policy] Detected pool: {pool_name}")
+        return Policy(name=name, pools=recorder.pools, schedules=recorder.schedules)
 
     # ---------------------------------------------------------------------
     # Policy Evaluation
     # ---------------------------------------------------------------------
 
+    # Bound on cached allocation verdicts; old entries are evicted LRU-first.
+    MAX_VERDICT_ENTRIES = 4096
+
     def evaluate_allocation(self, gpu: GPUInfo, requirements: Dict[str, Any]) -> bool:
         """Evaluate if a GPU meets allocation requirements."""
-        # Get all pools
-        pools = self.gpu_ops.get_all_pools()
-
-        for pool in pools:
-            if self._matches_pool(gpu, pool) and self._meets_requirements(gpu, requirements):
-                return True
-
-        return False
+        # Scheduling loops re-ask the same question against unchanged state;
+        # the registration version in the key invalidates on policy changes
+        # and the whole-degree temperature bucket absorbs sensor jitter.
+        req_key = _requirements_key(requirements)
+        key = (self.gpu_ops._version, gpu.id, int(gpu.temperature_c), req_key)
+        cached = self._verdict_cache.get(key)
+        if cached is not None:
+            self._verdict_cache.move_to_end(key)
+            return cached
+
+        norm = _normalized_requirements(req_key)
+        verdict = self._matches_fused(gpu, norm)
+
+        self._verdict_cache[key] = verdict
+        if len(self._verdict_cache) > self.MAX_VERDICT_ENTRIES:
+            self._verdict_cache.popitem(last=False)
+        return verdict
+
+    def _matches_fused(self, gpu: GPUInfo, norm: _NormReq) -> bool:
+        """
+        Single-pass pool + requirement check for one GPU.
 
-    def _matches_pool(self, gpu: GPUInfo, pool: GPUPool) -> bool:
-        """Check if GPU matches pool criteria."""
-        if pool.gpu_types and gpu.name not in pool.gpu_types:
-            # Partial matching (contains any of the types)
-            if not any(t in gpu.name for t in pool.gpu_types):
-                return False
+        Each GPU field is loaded once into a local, the pool-independent
+        requirement test runs before the pool loop, and per-pool checks are
+        ordered cheapest rejection first.
+        """
+        mem = gpu.memory_gb
+        temp = gpu.temperature_c
 
-        if gpu.memory_gb < pool.min_memory_gb:
+        if norm.min_memory is not None and mem < norm.min_memory:
             return False
-
-        if gpu.temperature_c > pool.max_temp_c:
+        if norm.max_temp is not None and temp > norm.max_temp:
             return False
-
-        if gpu.pool and gpu.pool != pool.name:
+        if norm.tag_mask and (gpu.tag_mask & norm.tag_mask) != norm.tag_mask:
             return False
 
-        return True
-
-    def _meets_requirements(self, gpu: GPUInfo, requirements: Dict[str, Any]) -> bool:
-        """Check if GPU meets specific requirements."""
-        if 'min_memory' in requirements and gpu.memory_gb < requirements['min_memory']:
-            return False
+        name = gpu.name
+        assigned_pool = gpu.pool
+        for pool in self.gpu_ops.get_all_pools():
+            if temp > pool.max_temp_c:
+                continue
+            if mem < pool.min_memory_gb:
+                continue
+            if assigned_pool and assigned_pool != pool.name:
+                continue
+            if pool._gpu_types_set and name not in pool._gpu_types_set \
+                    and not pool._name_contains_type(name):
+                continue
+            return True
 
-        if 'max_temp' in requirements and gpu.temperature_c > requirements['max_temp']:
-            return False
+        return False
 
-        if 'tags' in requirements:
-            required_tags = set(requirements['tags'])
-            available_tags = set(gpu.tags)
-            if not required_tags.issubset(available_tags):
-                return False
+    def _pool_table(self) -> Tuple[int, List[GPUPool], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pool-side constants packed into arrays, rebuilt only when the pool
+        set changes (tracked via the GPUOpsModule registration version).
+        """
+        version = self.gpu_ops._version
+        cached = self._pool_bounds
+        if cached is not None and cached[0] == version:
+            return cached
 
-        return True
+        pools = self.gpu_ops.get_all_pools()
+        self._pool_bounds = (
+            version,
+            pools,
+            np.array([p.min_memory_gb for p in pools], dtype=np.float32),
+            np.array([p.max_temp_c for p in pools], dtype=np.float32),
+            np.array([p.name for p in pools], dtype=object),
+        )
+        return self._pool_bounds
+
+    def _pool_match_mask(self, table: GPUInfoTable) -> np.ndarray:
+        """Pool-side half of evaluate_allocation, vectorized over a fleet."""
+        _, pools, pool_min_mem, pool_max_temp, pool_names = self._pool_table()
+        if not pools:
+            return np.zeros(len(table), dtype=np.bool_)
+
+        # All-pairs (gpu x pool) bound checks in one broadcast pass.
+        pair = (table.memory_gb[:, None] >= pool_min_mem[None, :]) \
+            & (table.temperature_c[:, None] <= pool_max_temp[None, :]) \
+            & ((table.pools == "")[:, None] | (table.pools[:, None] == pool_names[None, :]))
+
+        for j, pool in enumerate(pools):
+            if pool._gpu_types_set:
+                contains = pool._name_contains_type
+                pair[:, j] &= np.fromiter(
+                    (contains(name) for name in table.names),
+                    dtype=np.bool_, count=len(table),
+                )
+
+        return pair.any(axis=1)
+
+    def _allocation_mask(self, table: GPUInfoTable, requirements: Dict[str, Any]) -> np.ndarray:
+        """Vectorized evaluate_allocation over a fleet; returns a boolean mask."""
+        mask = self._pool_match_mask(table)
+
+        norm = _normalized_requirements(_requirements_key(requirements))
+
+        if norm.min_memory is not None:
+            mask &= table.memory_gb >= norm.min_memory
+
+        if norm.max_temp is not None:
+            mask &= table.temperature_c <= norm.max_temp
+
+        if norm.tag_mask:
+            req_mask = norm.tag_mask
+            if table.tag_masks.dtype == np.uint64 and req_mask >= (1 << 64):
+                # Required tag past the table's 64-bit vocab: nothing matches.
+                mask[:] = False
+            else:
+                if table.tag_masks.dtype == np.uint64:
+                    req_mask = np.uint64(req_mask)
+                mask &= (table.tag_masks & req_mask) == req_mask
+
+        return mask
+
+    def _score_table(self, table: GPUInfoTable) -> np.ndarray:
+        """Vectorized _score_gpu over a fleet."""
+        if _score_batch is not None:
+            return _score_batch(table.online, table.memory_gb, table.temperature_c)
+        return (
+            1.0
+            + 0.5 * table.online
+            + 0.3 * (table.memory_gb >= 16)
+            + 0.2 * (table.temperature_c < 60)
+            - 0.3 * (table.temperature_c > 80)
+        )
 
-    def get_recommended_gpus(self, gpus: List[GPUInfo], requirements: Dict[str, Any]) -> List[GPUInfo]:
-        """Get list of recommended GPUs based on policy."""
-        recommended = []
+    def get_recommended_gpus(self, gpus: List[GPUInfo], requirements: Dict[str, Any],
+                             top_k: Optional[int] = None) -> List[GPUInfo]:
+        """
+        Get list of recommended GPUs based on policy.
 
-        for gpu in gpus:
-            if self.evaluate_allocation(gpu, requirements):
-                score = self._score_gpu(gpu)
-                recommended.append((gpu, score))
+        With top_k set, only the K best GPUs are returned; selection uses an
+        O(N) partition plus an O(K log K) sort instead of sorting the whole
+        candidate set.
+        """
+        table = gpus if isinstance(gpus, GPUInfoTable) else GPUInfoTable(gpus)
+        if len(table) == 0:
+            return []
+
+        norm = _normalized_requirements(_requirements_key(requirements))
+        if (_match_batch is not None and table.tag_masks.dtype == np.uint64
+                and norm.tag_mask < (1 << 64)):
+            # Fused compiled pass: requirement checks and scoring in one
+            # sweep over the contiguous fleet arrays, outside the GIL.
+            match, all_scores = _match_batch(
+                table.memory_gb, table.temperature_c, table.online, table.tag_masks,
+                -np.inf if norm.min_memory is None else float(norm.min_memory),
+                np.inf if norm.max_temp is None else float(norm.max_temp),
+                np.uint64(norm.tag_mask),
+            )
+            mask = self._pool_match_mask(table) & match
+        else:
+            mask = self._allocation_mask(table, requirements)
+            all_scores = None
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        if all_scores is None:
+            all_scores = self._score_table(table)
+        scores = all_scores[candidates]
+        if top_k is not None and top_k < candidates.size:
+            keep = np.argpartition(-scores, top_k)[:top_k]
+            candidates = candidates[keep]
+            scores = scores[keep]
+        # Sort by score (descending); stable to keep input order on ties
+        order = np.argsort(-scores, kind="stable")
+        return [table.gpus[i] for i in candidates[order]]
+
+    def stream_recommended_gpus(self, gpus: Iterable[GPUInfo], requirements: Dict[str, Any],
+                                top_k: int) -> List[GPUInfo]:
+        """
+        Top-K recommendations from a GPU stream without materializing it.
 
-        # Sort by score (descending)
-        recommended.sort(key=lambda x: x[1], reverse=True)
-        return [gpu for gpu, _ in recommended]
+        Maintains a size-K min-heap as GPUs arrive: O(N log K) time and O(K)
+        memory, for feeds where the fleet is too large (or too unbounded) to
+        build a GPUInfoTable. Ties keep arrival order, as in the batch path.
+        """
+        heap: List[Tuple[float, int, GPUInfo]] = []
+        for i, gpu in enumerate(gpus):
+            if not self.evaluate_allocation(gpu, requirements):
+                continue
+            entry = (self._score_gpu(gpu), -i, gpu)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+        return [gpu for _, _, gpu in sorted(heap, reverse=True)]
 
     def _score_gpu(self, gpu: GPUInfo) -> float:
         """Calculate a suitability score for a GPU."""
-        score = 1.0
-
-        # Prefer GPUs with better health
-        if gpu.online:
-            score += 0.5
-
-        # Prefer GPUs with more memory
-        if gpu.memory_gb >= 16:
-            score += 0.3
-
-        # Prefer cooler GPUs
-        if gpu.temperature_c < 60:
-            score += 0.2
-
-        # Penalize high temperature
-        elif gpu.temperature_c > 80:
-            score -= 0.3
-
-        return score
+        return _score_kernel(gpu.online, gpu.memory_gb, gpu.temperature_c)
 
 
 # ============================================================================
@@ -358,9 +855,16 @@ def main():
     parser.add_argument("--list-pools", action="store_true", help="List registered pools")
     parser.add_argument("--list-schedules", action="store_true", help="List registered schedules")
     parser.add_argument("--test-gpu", type=int, help="Test allocation for specific GPU")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Show per-pool registration and load logs")
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="[Policy] %(message)s",
+    )
+
     engine = PolicyEngine(args.policy_dir)
 
     if args.load:
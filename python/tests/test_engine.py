@@ -0,0 +1,99 @@
+"""Tests for the Starlark policy engine."""
+
+import os
+import time
+
+import pytest
+
+from starlark_engine.engine import (
+    GPUInfo,
+    PolicyEngine,
+    clear_policy_cache,
+    policy_cache_size,
+)
+
+POLICY_SRC = """\
+def demo_pool():
+    return gpu_pool(
+        name = "gpu_pool_demo",
+        gpu_type = ["RTX_4090"],
+        min_memory_gb = 8,
+        max_temp_c = 90,
+    )
+
+gpu_ops.register_pool(demo_pool())
+
+def demo_scheduling():
+    return schedule_ruleset(
+        name = "demo_scheduling",
+        rules = [
+            balance_rule(metric = "temperature", strategy = "least"),
+        ]
+    )
+
+gpu_ops.register_schedule(demo_scheduling())
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Keep the module-level parse cache from leaking between tests."""
+    clear_policy_cache()
+    yield
+    clear_policy_cache()
+
+
+@pytest.fixture
+def policy_dir(tmp_path):
+    (tmp_path / "demo.gsky").write_text(POLICY_SRC)
+    return tmp_path
+
+
+def test_load_policy_registers_pools(policy_dir):
+    engine = PolicyEngine(str(policy_dir))
+    assert engine.load_policy("demo.gsky")
+    assert "gpu_pool_demo" in engine.gpu_ops.pools
+
+    policy = engine.policies["demo"]
+    assert [pool.name for pool in policy.pools] == ["gpu_pool_demo"]
+    assert [schedule.name for schedule in policy.schedules] == ["demo_scheduling"]
+
+
+def test_reload_after_edit_keeps_pools(policy_dir):
+    path = policy_dir / "demo.gsky"
+    engine = PolicyEngine(str(policy_dir))
+    assert engine.load_policy("demo.gsky")
+
+    # Edit the file on disk; reloading re-registers the same pool and
+    # schedule names, which must still be attributed to the policy.
+    path.write_text(POLICY_SRC + "\n# edited\n")
+    future = time.time() + 10
+    os.utime(path, (future, future))
+    assert engine.load_policy("demo.gsky")
+    assert [pool.name for pool in engine.policies["demo"].pools] == ["gpu_pool_demo"]
+    assert [s.name for s in engine.policies["demo"].schedules] == ["demo_scheduling"]
+
+    # A fresh engine now loads the unchanged file via the parse cache; the
+    # replay path must register the pools too, not just store the Policy.
+    fresh = PolicyEngine(str(policy_dir))
+    assert fresh.load_policy("demo.gsky")
+    assert "gpu_pool_demo" in fresh.gpu_ops.pools
+
+    gpu = GPUInfo(id=0, name="RTX_4090", uuid="gpu-0", memory_gb=24.0,
+                  temperature_c=40.0, power_w=200.0)
+    assert fresh.evaluate_allocation(gpu, {"min_memory": 16})
+
+
+def test_policy_cache_helpers(policy_dir):
+    engine = PolicyEngine(str(policy_dir))
+    assert policy_cache_size() == 0
+
+    assert engine.load_policy("demo.gsky")
+    assert policy_cache_size() == 1
+
+    # Unchanged file: served from the cache, no new entry.
+    assert engine.load_policy("demo.gsky")
+    assert policy_cache_size() == 1
+
+    clear_policy_cache()
+    assert policy_cache_size() == 0